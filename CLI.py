@@ -19,7 +19,6 @@ Usage examples:
 """
 import argparse
 import os
-import shlex
 import sys
 from pathlib import Path
 from typing import Optional
@@ -44,6 +43,24 @@ def parse_token(token: str):
         return c.strip().upper(), p.strip()
     return token.strip().upper(), ""
 
+# Raw token -> RobotClient call, shared by the REPL and batch mode
+_TOKEN_CALLS = {
+    "PING":   lambda rc, p: rc.ping(),
+    "STATUS": lambda rc, p: rc.status(),
+    "V":      lambda rc, p: rc.set_v(int(p)),
+    "M":      lambda rc, p: rc.move_cm(int(p)),
+    "R":      lambda rc, p: rc.rotate_deg(int(p)),
+    "S":      lambda rc, p: rc.stop(),
+    "B":      lambda rc, p: rc.sonar(),
+    "I":      lambda rc, p: rc.ir(),
+}
+
+_BATCH_CALLS = {
+    **_TOKEN_CALLS,
+    "HELP":    lambda rc, p: "See 'help' in interactive mode.",
+    "HISTORY": lambda rc, p: rc.history(),
+}
+
 # ---------------------------
 # REPL Shell
 # ---------------------------
@@ -74,16 +91,16 @@ class RobotShell:
             "You can also enter raw tokens like:  PING  V:160  M:20  R:-90  B  STATUS  S"
         )
 
-    def do_ping(self, *_):          self._run(lambda: self.rc.ping(), "PING")
-    def do_status(self, *_):        self._run(lambda: self.rc.status(), "STATUS")
+    def do_ping(self, *_):          self._run(self.rc.ping, "PING")
+    def do_status(self, *_):        self._run(self.rc.status, "STATUS")
     def do_history(self, *_):       print(self.rc.history() or "<empty>")
 
-    def do_v(self, *args):          self._need_arg(args, "v <0..255>"); self._run(lambda: self.rc.set_v(int(args[0])), f"V {args[0]}")
-    def do_m(self, *args):          self._need_arg(args, "m <cm>");     self._run(lambda: self.rc.move_cm(int(args[0])), f"M {args[0]}")
-    def do_r(self, *args):          self._need_arg(args, "r <deg>");    self._run(lambda: self.rc.rotate_deg(int(args[0])), f"R {args[0]}")
-    def do_s(self, *_):             self._run(lambda: self.rc.stop(), "S")
-    def do_b(self, *_):             self._run(lambda: self.rc.sonar(), "B")
-    def do_i(self, *_):             self._run(lambda: self.rc.ir(), "I")
+    def do_v(self, *args):          self._need_arg(args, "v <0..255>"); self._run(self.rc.set_v, f"V {args[0]}", args[0])
+    def do_m(self, *args):          self._need_arg(args, "m <cm>");     self._run(self.rc.move_cm, f"M {args[0]}", args[0])
+    def do_r(self, *args):          self._need_arg(args, "r <deg>");    self._run(self.rc.rotate_deg, f"R {args[0]}", args[0])
+    def do_s(self, *_):             self._run(self.rc.stop, "S")
+    def do_b(self, *_):             self._run(self.rc.sonar, "B")
+    def do_i(self, *_):             self._run(self.rc.ir, "I")
 
     def do_save_log(self, *args):
         self._need_arg(args, "save-log <path>")
@@ -125,6 +142,29 @@ class RobotShell:
         exit(0)
     def do_exit(self, *_): raise EOFError()
 
+    # REPL word -> handler(self, *args)
+    _COMMANDS = {
+        "h": do_help, "?": do_help, "help": do_help,
+        "ping": do_ping,
+        "status": do_status,
+        "v": do_v,
+        "m": do_m,
+        "r": do_r,
+        "s": do_s,
+        "b": do_b,
+        "i": do_i,
+        "history": do_history,
+        "save-log": do_save_log, "savelog": do_save_log,
+        "reconnect": do_reconnect,
+        "quit": do_quit, "exit": do_quit,
+    }
+
+    # Client-side raw tokens handled without a request
+    _LOCAL_TOKENS = {
+        "HELP": do_help,
+        "HISTORY": do_history,
+    }
+
     # ---- Core REPL loop ----
     def loop(self):
         self.do_help()
@@ -148,61 +188,39 @@ class RobotShell:
                 self._dispatch_token(cmd, payload)
                 continue
 
-            # Parse as "cmd args..."
-            try:
-                parts = shlex.split(line)
-            except ValueError as e:
-                print_warn(f"Parse error: {e}")
-                continue
-            if not parts:
-                continue
+            # Parse as "cmd args..." (no quoting needed: args are numbers/paths/flags)
+            parts = line.split()
 
             cmd = parts[0].lower()
             args = parts[1:]
 
-
-            if cmd in {"h", "?", "help"}:            self.do_help()
-            elif cmd in {"ping"}:                    self.do_ping()
-            elif cmd in {"status"}:                  self.do_status()
-            elif cmd in {"v"}:                       self.do_v(*args)
-            elif cmd in {"m"}:                       self.do_m(*args)
-            elif cmd in {"r"}:                       self.do_r(*args)
-            elif cmd in {"s"}:                       self.do_s()
-            elif cmd in {"b"}:                       self.do_b()
-            elif cmd in {"i"}:                       self.do_i()
-            elif cmd in {"history"}:                 self.do_history()
-            elif cmd in {"save-log", "savelog"}:     self.do_save_log(*args)
-            elif cmd in {"reconnect"}:               self.do_reconnect(*args)
-            elif cmd in {"quit", "exit"}:            self.do_quit()
-            else:
+            handler = self._COMMANDS.get(cmd)
+            if handler:
+                handler(self, *args)
+            elif ":" in cmd:
                 # Fallback: try raw token "CMD[:payload]" split by colon and spaces
-                if ":" in cmd:
-                    c, p = parse_token(cmd)
-                    self._dispatch_token(c, p)
-                else:
-                    print_warn("Unknown command. Type 'help'.")
+                c, p = parse_token(cmd)
+                self._dispatch_token(c, p)
+            else:
+                print_warn("Unknown command. Type 'help'.")
 
     # ---- Utilities ----
     def _dispatch_token(self, c: str, p: str):
         try:
-            if c == "PING":       self._run(lambda: self.rc.ping(), "PING")
-            elif c == "HELP":     self.do_help()
-            elif c == "STATUS":   self._run(lambda: self.rc.status(), "STATUS")
-            elif c == "HISTORY":  self.do_history()
-            elif c == "V":        self._run(lambda: self.rc.set_v(int(p or "0")), f"V {p}")
-            elif c == "M":        self._run(lambda: self.rc.move_cm(int(p or "0")), f"M {p}")
-            elif c == "R":        self._run(lambda: self.rc.rotate_deg(int(p or "0")), f"R {p}")
-            elif c == "S":        self._run(lambda: self.rc.stop(), "S")
-            elif c == "B":        self._run(lambda: self.rc.sonar(), "B")
-            elif c == "I":        self._run(lambda: self.rc.ir(), "I")
+            local = self._LOCAL_TOKENS.get(c)
+            call = _TOKEN_CALLS.get(c)
+            if local:
+                local(self)
+            elif call:
+                self._run(call, f"{c} {p}" if p else c, self.rc, p or "0")
             else:
                 print_warn(f"Unknown token '{c}'. Type 'help'.")
         except Exception as e:
             print_err(f"Error: {e}")
 
-    def _run(self, fn, label: str):
+    def _run(self, fn, label: str, *args):
         try:
-            resp = fn()
+            resp = fn(*args)
             print_ok(f"{label} -> {resp}")
         except Exception as e:
             print_err(f"{label} failed: {e}")
@@ -216,26 +234,36 @@ class RobotShell:
 # Main
 # ---------------------------
 def run_batch(rc: RobotClient, tokens):
-    for token in tokens:
-        token = token.strip()
-        if not token or token.startswith("#"):
-            continue
-        c, p = parse_token(token) if ":" in token else (token.upper(), "")
-        try:
-            if c == "PING":      print(rc.ping())
-            elif c == "HELP":    print("See 'help' in interactive mode.")
-            elif c == "STATUS":  print(rc.status())
-            elif c == "HISTORY": print(rc.history())
-            elif c == "V":       print(rc.set_v(int(p)))
-            elif c == "M":       print(rc.move_cm(int(p)))
-            elif c == "R":       print(rc.rotate_deg(int(p)))
-            elif c == "S":       print(rc.stop())
-            elif c == "B":       print(rc.sonar())
-            elif c == "I":       print(rc.ir())
-            else:
+    # Responses are collected and written in one go. Warnings/errors flush
+    # what is pending first; notices printed by RobotClient itself (e.g. the
+    # BAD_CS resend) are not buffered and may show up ahead of earlier responses.
+    out = []
+
+    def flush():
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
+            out.clear()
+        sys.stdout.flush()
+
+    try:
+        for token in tokens:
+            token = token.strip()
+            if not token or token.startswith("#"):
+                continue
+            c, p = parse_token(token) if ":" in token else (token.upper(), "")
+            call = _BATCH_CALLS.get(c)
+            if call is None:
+                flush()
                 print_warn(f"Unknown token: {token}")
-        except Exception as e:
-            print_err(f"{token} -> {e}")
+                continue
+            try:
+                out.append(str(call(rc, p)))
+            except Exception as e:
+                flush()
+                print_err(f"{token} -> {e}")
+    finally:
+        # also on Ctrl-C: show which commands were already acknowledged
+        flush()
 
 def main():
     ap = argparse.ArgumentParser(description="Interactive CLI for robot_client.RobotClient (no modifications to robot_client.py).")
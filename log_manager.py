@@ -1,15 +1,21 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from datetime import datetime, timezone
-from typing import List, Optional, Iterable
+from collections import deque
+from functools import lru_cache
+from typing import Deque, List, NamedTuple, Optional, Iterable, Union
 import threading
-import json
-import csv
 import os
+import time
+import warnings
 
-def _utcnow_iso() -> str:
-    # ISO 8601 with milliseconds and explicit Z
-    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+@lru_cache(maxsize=256)
+def _iso_seconds(s: int) -> str:
+    # Log entries come in bursts, so most share their second with a neighbour
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s))
+
+def _ns_to_iso(ns: int) -> str:
+    # ISO 8601 UTC with milliseconds and explicit Z
+    s, r = divmod(ns, 1_000_000_000)
+    return f"{_iso_seconds(s)}.{r // 1_000_000:03d}Z"
 
 def _to_str(msg) -> str:
     """Return a safe, human-readable string for msg (bytes→hex if undecodable)."""
@@ -22,57 +28,147 @@ def _to_str(msg) -> str:
             return bytes(msg).hex()
     return str(msg)
 
-@dataclass
-class LogEntry:
-    ts_utc: str           # UTC timestamp (ISO 8601, Z)
+class LogEntry(NamedTuple):
+    ts_ns: int            # UTC timestamp (ns since epoch, see time.time_ns)
     direction: str        # "TX" or "RX"
     message: str          # UTF-8 text if possible, else hex
     raw_hex: Optional[str] = None  # Raw bytes as hex (if supplied)
     seq: Optional[int] = None      # Optional protocol sequence number
 
+# Max entries kept in memory; older ones are dropped (override via ROBOT_LOG_MAX)
+DEFAULT_CAPACITY = 10000
+
+# Write buffer for save(); large logs otherwise cost one syscall per ~8 KB
+_SAVE_BUFFERING = 128 * 1024
+
+_FIELDS = ["ts_utc", "direction", "message", "raw_hex", "seq"]
+
+def _env_capacity() -> int:
+    """ROBOT_LOG_MAX if set to a positive integer, else DEFAULT_CAPACITY."""
+    value = os.environ.get("ROBOT_LOG_MAX")
+    if value is None:
+        return DEFAULT_CAPACITY
+    try:
+        capacity = int(value)
+    except ValueError:
+        capacity = 0
+    if capacity < 1:
+        warnings.warn(f"Invalid ROBOT_LOG_MAX={value!r}; using {DEFAULT_CAPACITY}")
+        return DEFAULT_CAPACITY
+    return capacity
+
+def _fmt_txt(ts: str, direction: str, message: str, raw_hex: Optional[str], seq: Optional[int]) -> str:
+    return (
+        f"[{ts}] {direction} {message!r}"
+        f"{' raw=' + raw_hex if raw_hex else ''}"
+        f"{' seq=' + str(seq) if seq is not None else ''}"
+    )
+
+def _row(direction: str, message, raw: Optional[bytes], seq: Optional[int], ts_ns: Optional[int]) -> tuple:
+    """Build one (ts_ns, direction, message, raw_hex, seq) row for CommLogger."""
+    if ts_ns is None:
+        ts_ns = time.time_ns()
+    if not isinstance(message, bytes):
+        message = _to_str(message)  # bytes are kept as-is and decoded on read
+    raw_hex = raw.hex() if isinstance(raw, (bytes, bytearray)) else None
+    return ts_ns, direction, message, raw_hex, seq
+
 class CommLogger:
-    """Thread-safe logger for serial comms — minimal fields, easy API."""
-    def __init__(self) -> None:
+    """
+    Thread-safe logger for serial comms — minimal fields, easy API.
+    Keeps at most `capacity` entries; the oldest are dropped first.
+    """
+    def __init__(self, capacity: Optional[int] = None) -> None:
         self._lock = threading.Lock()
-        self._entries: List[LogEntry] = []
+        if capacity is None:
+            capacity = _env_capacity()
+        elif capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._dropped = 0
+        self._init_columns(capacity)
+
+    def _init_columns(self, capacity: int, columns: Iterable[Iterable] = ((),) * 5) -> None:
+        # One ring buffer per LogEntry field (columns), appended in lockstep
+        ts, dir_, msg, raw, seq = columns
+        self._capacity = capacity
+        self._ts: Deque[int] = deque(ts, maxlen=capacity)
+        self._dir: Deque[str] = deque(dir_, maxlen=capacity)
+        self._msg: Deque[Union[str, bytes]] = deque(msg, maxlen=capacity)
+        self._raw: Deque[Optional[str]] = deque(raw, maxlen=capacity)
+        self._seq: Deque[Optional[int]] = deque(seq, maxlen=capacity)
 
     # --- Simple API ----------------------------------------------------------
-    def tx(self, message, *, raw: Optional[bytes] = None, seq: Optional[int] = None) -> None:
-        """Log a transmitted (TX) message."""
-        entry = LogEntry(
-            ts_utc=_utcnow_iso(),
-            direction="TX",
-            message=_to_str(message),
-            raw_hex=(raw.hex() if isinstance(raw, (bytes, bytearray)) else None),
-            seq=seq,
-        )
+    def tx(self, message, *, raw: Optional[bytes] = None, seq: Optional[int] = None,
+           ts_ns: Optional[int] = None) -> None:
+        """Log a transmitted (TX) message. ts_ns defaults to now (time.time_ns)."""
+        self._append(_row("TX", message, raw, seq, ts_ns))
+
+    def rx(self, message, *, raw: Optional[bytes] = None, seq: Optional[int] = None,
+           ts_ns: Optional[int] = None) -> None:
+        """Log a received (RX) message. ts_ns defaults to now (time.time_ns)."""
+        self._append(_row("RX", message, raw, seq, ts_ns))
+
+    def log_pair(self, tx_message, rx_message, *,
+                 tx_raw: Optional[bytes] = None, rx_raw: Optional[bytes] = None,
+                 tx_seq: Optional[int] = None, rx_seq: Optional[int] = None,
+                 tx_ts_ns: Optional[int] = None) -> None:
+        """Log a request (TX) and its response (RX) under a single lock acquisition."""
+        self._append(_row("TX", tx_message, tx_raw, tx_seq, tx_ts_ns),
+                     _row("RX", rx_message, rx_raw, rx_seq, None))
+
+    def _append(self, *rows: tuple) -> None:
         with self._lock:
-            self._entries.append(entry)
-
-    def rx(self, message, *, raw: Optional[bytes] = None, seq: Optional[int] = None) -> None:
-        """Log a received (RX) message."""
-        entry = LogEntry(
-            ts_utc=_utcnow_iso(),
-            direction="RX",
-            message=_to_str(message),
-            raw_hex=(raw.hex() if isinstance(raw, (bytes, bytearray)) else None),
-            seq=seq,
-        )
-        with self._lock:
-            self._entries.append(entry)
+            for ts_ns, direction, message, raw_hex, seq in rows:
+                if len(self._ts) == self._capacity:
+                    self._dropped += 1
+                self._ts.append(ts_ns)
+                self._dir.append(direction)
+                self._msg.append(message)
+                self._raw.append(raw_hex)
+                self._seq.append(seq)
 
     # --- Accessors -----------------------------------------------------------
     def __len__(self) -> int:
         with self._lock:
-            return len(self._entries)
+            return len(self._ts)
 
-    def entries(self) -> List[LogEntry]:
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dropped(self) -> int:
+        """Number of entries discarded because the logger was full."""
+        with self._lock:
+            return self._dropped
+
+    def set_capacity(self, capacity: int) -> None:
+        """Change the max number of kept entries, keeping the newest ones."""
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
         with self._lock:
-            return list(self._entries)
+            self._dropped += max(0, len(self._ts) - capacity)
+            self._init_columns(capacity, (self._ts, self._dir, self._msg, self._raw, self._seq))
+
+    def entries(self) -> List[LogEntry]:
+        ts, dir_, msg, raw, seq = self._snapshot()
+        return list(map(LogEntry, ts, dir_, map(_to_str, msg), raw, seq))
 
     def clear(self) -> None:
         with self._lock:
-            self._entries.clear()
+            for col in (self._ts, self._dir, self._msg, self._raw, self._seq):
+                col.clear()
+            self._dropped = 0
+
+    def _snapshot(self) -> tuple:
+        """Copy of the columns (ts_ns, direction, message, raw_hex, seq)."""
+        with self._lock:
+            return list(self._ts), list(self._dir), list(self._msg), list(self._raw), list(self._seq)
+
+    def _rows(self) -> Iterable[tuple]:
+        """Rows for serialization; timestamps and messages are formatted only here."""
+        ts, dir_, msg, raw, seq = self._snapshot()
+        return zip(map(_ns_to_iso, ts), dir_, map(_to_str, msg), raw, seq)
 
     # --- Save ---------------------------------------------------------------
     def save(self, path: str) -> None:
@@ -93,28 +189,21 @@ class CommLogger:
             raise ValueError("Unsupported extension. Use .json, .csv, or .txt")
 
     def _save_json(self, path: str) -> None:
-        with self._lock, open(path, "w", encoding="utf-8") as f:
-            for e in self._entries:
-                json.dump(asdict(e), f, ensure_ascii=False)
-                f.write("\n")
+        import json
+        with open(path, "w", encoding="utf-8", buffering=_SAVE_BUFFERING) as f:
+            f.writelines(json.dumps(dict(zip(_FIELDS, row)), ensure_ascii=False) + "\n"
+                         for row in self._rows())
 
     def _save_csv(self, path: str) -> None:
-        with self._lock, open(path, "w", encoding="utf-8", newline="") as f:
-            import csv
-            writer = csv.DictWriter(f, fieldnames=["ts_utc", "direction", "message", "raw_hex", "seq"])
-            writer.writeheader()
-            for e in self._entries:
-                writer.writerow(asdict(e))
+        import csv
+        with open(path, "w", encoding="utf-8", newline="", buffering=_SAVE_BUFFERING) as f:
+            writer = csv.writer(f)
+            writer.writerow(_FIELDS)
+            writer.writerows(self._rows())
 
     def _save_txt(self, path: str) -> None:
-        with self._lock, open(path, "w", encoding="utf-8") as f:
-            for e in self._entries:
-                line = (
-                    f"[{e.ts_utc}] {e.direction} {e.message!r}"
-                    f"{' raw='+e.raw_hex if e.raw_hex else ''}"
-                    f"{' seq='+str(e.seq) if e.seq is not None else ''}"
-                )
-                f.write(line + "\n")
+        with open(path, "w", encoding="utf-8", buffering=_SAVE_BUFFERING) as f:
+            f.writelines(_fmt_txt(*row) + "\n" for row in self._rows())
 
     def to_string(self, fmt: str = "txt") -> str:
         """
@@ -122,33 +211,23 @@ class CommLogger:
         Supported: "txt" (human-readable), "json" (NDJSON), "csv".
         """
         fmt = fmt.lower().strip()
-        with self._lock:
-            entries = list(self._entries)
+        rows = self._rows()
 
         if fmt == "txt":
-            lines = []
-            for e in entries:
-                line = (
-                    f"[{e.ts_utc}] {e.direction} {e.message!r}"
-                    f"{' raw=' + e.raw_hex if e.raw_hex else ''}"
-                    f"{' seq=' + str(e.seq) if e.seq is not None else ''}"
-                )
-                lines.append(line)
-            return "\n".join(lines)
+            return "\n".join(_fmt_txt(*row) for row in rows)
 
         elif fmt == "json":
             import json
-            return "\n".join(json.dumps(asdict(e), ensure_ascii=False) for e in entries)
+            return "\n".join(json.dumps(dict(zip(_FIELDS, row)), ensure_ascii=False) for row in rows)
 
         elif fmt == "csv":
             import csv
             import io
             buf = io.StringIO()
-            writer = csv.DictWriter(buf, fieldnames=["ts_utc", "direction", "message", "raw_hex", "seq"])
-            writer.writeheader()
-            for e in entries:
-                writer.writerow(asdict(e))
+            writer = csv.writer(buf)
+            writer.writerow(_FIELDS)
+            writer.writerows(rows)
             return buf.getvalue()
 
         else:
-            raise ValueError('Unsupported format. Use "txt", "json", or "csv".')
\ No newline at end of file
+            raise ValueError('Unsupported format. Use "txt", "json", or "csv".')
@@ -11,6 +11,7 @@ Commands:
 import serial
 import time
 import CLI
+from functools import lru_cache
 
 
 from log_manager import CommLogger
@@ -18,20 +19,53 @@ from log_manager import CommLogger
 START = b'^'
 END   = b'$'
 
+# Two-digit uppercase hex for every byte value, as ASCII bytes (SEQ and CS fields)
+_HEX2 = tuple(f"{i:02X}".encode('ascii') for i in range(256))
+
+# Below this the plain loop beats the big-int fold (crossover is ~90 bytes).
+# Firmware frames are at most 96 bytes, so real traffic always takes the loop;
+# the fold only serves longer content up to the 256-byte RX guard.
+_SWAR_MIN_LEN = 128
+
 def xor_checksum(b: bytes) -> int:
-    cs = 0
-    for x in b:
-        cs ^= x
-    return cs & 0xFF
+    n = len(b)
+    if n < _SWAR_MIN_LEN:
+        cs = 0
+        for x in b:
+            cs ^= x
+        return cs
+    # Long content: read it as one int and XOR the upper half onto the lower
+    # half until a single byte is left (log2(n) big-int ops, all in C)
+    width = 1 << (n - 1).bit_length()  # bytes, rounded up to a power of two
+    v = int.from_bytes(b, 'little')
+    while width > 1:
+        width >>= 1
+        v = (v ^ (v >> (width * 8))) & ((1 << (width * 8)) - 1)
+    return v
 
 def to_hex2(v: int) -> str:
     return f"{v:02X}"
 
+@lru_cache(maxsize=128)
+def _frame_tail(cmd: str, payload: str):
+    """
+    Returns (tail:bytes, cs:int) for the seq-independent part '|<CMD>|<PAYLOAD>'.
+    """
+    tail = f"|{cmd}|{payload}".encode('ascii')
+    return tail, xor_checksum(tail)
+
+# Parameterless commands as sent by RobotClient (payload " "), built once and
+# kept out of the LRU so polling them never competes with V/M/R payloads
+_FIXED_TAILS = {
+    (cmd, " "): _frame_tail.__wrapped__(cmd, " ")
+    for cmd in ("PING", "HELP", "STATUS", "S", "B", "I")
+}
+
 def build_frame(seq: int, cmd: str, payload: str = "") -> bytes:
-    content = f"{to_hex2(seq)}|{cmd}|{payload}".encode('ascii')
-    cs = xor_checksum(content)
-    frame = b'^' + content + b'*' + f"{cs:02X}".encode('ascii') + b'$'
-    return frame
+    tail, tail_cs = _FIXED_TAILS.get((cmd, payload)) or _frame_tail(cmd, payload)
+    seq_hex = _HEX2[seq & 0xFF]
+    cs = tail_cs ^ seq_hex[0] ^ seq_hex[1]
+    return b''.join((START, seq_hex, tail, b'*', _HEX2[cs], END))
 
 def parse_frame(buf: bytes):
     """
@@ -47,13 +81,13 @@ def parse_frame(buf: bytes):
     if len(cs_hex) != 2:
         raise ValueError("Bad CS length")
     try:
-        got_cs = int(cs_hex.decode('ascii'), 16)
+        got_cs = int(cs_hex, 16)
     except Exception:
         raise ValueError("Bad CS hex")
     calc_cs = xor_checksum(content)
     if calc_cs != got_cs:
         raise ValueError("Checksum mismatch")
-    parts = content.decode('ascii').split('|')
+    parts = content.split(b'|')
     if len(parts) != 3:
         raise ValueError("Bad content fields")
     seq_hex, cmd, payload = parts
@@ -61,7 +95,7 @@ def parse_frame(buf: bytes):
         seq = int(seq_hex, 16)
     except Exception:
         raise ValueError("Bad seq")
-    return seq, cmd, payload
+    return seq, cmd.decode('ascii'), payload.decode('ascii')
 
 def open_serial(port: str, baud: int, timeout: float = 0.5) -> serial.Serial:
     ser = serial.Serial(port, baudrate=baud, timeout=timeout)
@@ -69,35 +103,72 @@ def open_serial(port: str, baud: int, timeout: float = 0.5) -> serial.Serial:
     time.sleep(1.5)
     return ser
 
-def recv_frame(ser: serial.Serial, timeout: float) -> bytes:
-    """Read one framed message by scanning for '^'...'$', honoring timeout."""
-    ser.timeout = 0.05
-    start_time = time.time()
-    buf = bytearray()
-    in_frame = False
-    while time.time() - start_time < timeout:
-        b = ser.read(1)
-        if not b:
-            continue
-        c = b[0]
-        if not in_frame:
-            if c == ord('^'):
-                in_frame = True
-                buf.clear()
-                buf.append(c)
+RX_BUF_SIZE = 256  # max frame length (guard against runaway frames)
+# Port timeout tolerance in recv_frame: each timeout change reconfigures the
+# port, so it is only changed when off by more than this (bounds the overshoot)
+TIMEOUT_SLACK = 0.05
+
+class RxBuffer:
+    """Fixed-size receive window reused by recv_frame across calls."""
+    def __init__(self, size: int = RX_BUF_SIZE):
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        self.n = 0  # number of valid bytes at the front of data
+
+    def consume(self, k: int) -> None:
+        """Drop the first k valid bytes, moving the rest to the front."""
+        rest = self.n - k
+        if rest > 0:
+            self.data[:rest] = bytes(self.view[k:self.n])
+        self.n = max(rest, 0)
+
+    def clear(self) -> None:
+        self.n = 0
+
+def recv_frame(ser: serial.Serial, timeout: float, rx: RxBuffer = None) -> bytes:
+    """
+    Read one framed message by scanning for '^'...'$', honoring timeout.
+    Reads whatever is waiting in one call into rx; bytes past the frame stay there.
+    Without a caller-owned rx it reads byte by byte, so nothing past '$' is consumed.
+    When nothing is waiting the read blocks in pyserial until data or timeout.
+    """
+    chunked = rx is not None
+    if not chunked:
+        rx = RxBuffer()
+    if ser.timeout is None or abs(ser.timeout - timeout) > TIMEOUT_SLACK:
+        ser.timeout = timeout
+    deadline = time.monotonic() + timeout
+    while True:
+        start = rx.data.find(START, 0, rx.n)
+        if start < 0:
+            rx.clear()
         else:
-            buf.append(c)
-            if c == ord('$'):
-                return bytes(buf)
-            if len(buf) > 256:  # guard
-                in_frame = False
-                buf.clear()
-    raise TimeoutError("Recv timeout")
+            if start:
+                rx.consume(start)
+            end = rx.data.find(END, 0, rx.n)
+            if end >= 0:
+                # a later '^' means the bytes before it are a cut-off frame
+                # (e.g. left over from a timed-out attempt): start over there
+                start = rx.data.rfind(START, 0, end)
+                frame = bytes(rx.view[start:end + 1])
+                rx.consume(end + 1)
+                return frame
+            if rx.n == len(rx.data):  # guard
+                rx.consume(1)
+                continue
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Recv timeout")
+        if remaining < ser.timeout - TIMEOUT_SLACK:
+            ser.timeout = remaining  # don't let a blocking read run far past the deadline
+        want = max(1, min(ser.in_waiting, len(rx.data) - rx.n)) if chunked else 1
+        rx.n += ser.readinto(rx.view[rx.n:rx.n + want])
 
 class RobotClient:
     def __init__(self, port: str, baud: int = 9600, base_timeout: float = 0.6, max_retries: int = 3):
         self.logger = CommLogger()
         self.ser = open_serial(port, baud)
+        self._rx = RxBuffer()
         self.seq = 0
         self.base_timeout = base_timeout
         self.max_retries = max_retries
@@ -106,48 +177,54 @@ class RobotClient:
         self.seq = (self.seq + 1) & 0xFF
         return self.seq
 
+    def _request_once(self, frame: bytes, seq: int, timeout: float):
+        """
+        Single send/receive round trip for a built frame, no retries.
+        Returns ("ACK"|"NACK", info) for a matching response or (None, None) if the
+        response had another seq or type. Raises TimeoutError / ValueError (parse/CS).
+        """
+        tx_ns = time.time_ns()
+        try:
+            # send
+            self.ser.write(frame)
+            # wait response
+            raw = recv_frame(self.ser, timeout=timeout, rx=self._rx)
+            r_seq, r_cmd, r_payload = parse_frame(raw)
+        except BaseException:
+            # no usable response (incl. Ctrl-C after the write): log the TX on its own
+            self.logger.tx(frame, raw=frame, seq=seq, ts_ns=tx_ns)
+            raise
+
+        message =f"{r_seq}|{r_cmd}|{r_payload}"
+        self.logger.log_pair(frame, message, tx_raw=frame, rx_raw=raw,
+                             tx_seq=seq, rx_seq=r_seq, tx_ts_ns=tx_ns)
+
+        if r_seq != seq or r_cmd not in ("ACK", "NACK"):
+            # mismatched seq or unexpected message type
+            return None, None
+        return r_cmd, r_payload
+
     def request(self, cmd: str, payload: str = " ") -> str:
         seq = self.next_seq()
         frame = build_frame(seq, cmd, payload)
-        text = frame.decode('utf-8')
         backoff = self.base_timeout
         for attempt in range(1, self.max_retries + 1):
-            # send
-            self.logger.tx(text, raw=frame, seq=seq)
-            self.ser.write(frame)
-            # wait response
             try:
-                raw = recv_frame(self.ser, timeout=backoff)
-                r_seq, r_cmd, r_payload = parse_frame(raw)
-
-                message =f"{r_seq}|{r_cmd}|{r_payload}"
-                self.logger.rx(message, raw=raw, seq=r_seq)
-
-                if r_seq != seq:
-                    # mismatched seq - ignore and keep waiting within same attempt
-                    continue
-                if r_cmd == "ACK":
-                    return r_payload  # success
-                elif r_cmd == "NACK":
-                    if r_payload == "BAD_CS":
-                        CLI.print_warn(r_payload)
-                        CLI.print_info("resending command...")
-                        return self.request(cmd, payload)
-                    raise RuntimeError(f"NACK: {r_payload}")
-                else:
-                    # unexpected message type, continue waiting
-                    continue
-            except TimeoutError:
-                # retry with backoff
-                backoff *= 2
-            except ValueError as e:
-                # parse/CS error, retry
+                status, info = self._request_once(frame, seq, backoff)
+            except (TimeoutError, ValueError):
+                # timeout or parse/CS error, retry with backoff
                 backoff *= 2
+                continue
+            if status == "ACK":
+                return info  # success
+            elif status == "NACK":
+                if info == "BAD_CS":
+                    CLI.print_warn(info)
+                    CLI.print_info("resending command...")
+                    return self.request(cmd, payload)
+                raise RuntimeError(f"NACK: {info}")
         raise TimeoutError(f"No valid ACK after {self.max_retries} tries")
 
-
-
-
     # Convenience wrappers
     def ping(self) -> str: return self.request("PING")
     def help(self) -> str: return self.request("HELP")
@@ -164,19 +241,21 @@ class RobotClient:
 
     def is_link_alive(self, timeout_s=1.0):
         """
-        Checks if the serial connection is still alive by sending a PING request.
+        Checks if the serial connection is still alive by sending a single PING
+        (no retries/backoff, waits at most timeout_s for the reply).
         Returns True if the connection responds with ACK, otherwise False.
         """
         if self.ser is None or not getattr(self.ser, "is_open", False):
             return False
 
         old_timeout = self.ser.timeout
-        self.ser.timeout = timeout_s
         try:
             self.ser.reset_input_buffer()
             self.ser.reset_output_buffer()
-            line = self.ping()
-            return line == "ACK"
+            self._rx.clear()
+            seq = self.next_seq()
+            status, _ = self._request_once(build_frame(seq, "PING", " "), seq, timeout_s)
+            return status == "ACK"
         except Exception:
             return False
         finally:
@@ -238,6 +317,7 @@ class RobotClient:
                 time.sleep(2.0)
                 self.ser.reset_input_buffer()
                 self.ser.reset_output_buffer()
+                self._rx.clear()
 
                 # Optionally test connection health after opening
                 if not do_ping_check or self.is_link_alive():